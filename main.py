@@ -4,24 +4,68 @@ from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel
 
 load_dotenv()
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
+from fastapi.middleware.gzip import GZipMiddleware
 import random
 from supabase import create_client, Client
 import uvicorn
-from datetime import datetime, timedelta
-import pytz
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
 import asyncio
 from typing import Dict, Any
 import logging
 import re
+from dateutil import parser as dateutil_parser
 from collections import defaultdict
+from functools import lru_cache, partial
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, suppress
+import csv
+import orjson
 
 # MCP integration
 from fastapi_mcp import FastApiMCP
 
-app = FastAPI()
+# Report updater - imported once at startup so the update path doesn't resolve it per run
+try:
+    from surf_reports.surf_report_update_spot import update_spot_to_supabase
+except ImportError as e:
+    logging.error(f"surf_reports module not available: {e}")
+    update_spot_to_supabase = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up the DB pool, page template and report refresher, and tear them down in reverse order"""
+    # The refresher uses the DB pool, so the pool is created first and shut down last
+    app.state.db_executor = ThreadPoolExecutor(max_workers=DB_MAX_WORKERS, thread_name_prefix='db')
+    # Compile the page template up front so a missing file fails fast
+    compile_html_template()
+    # Warm the report cache and keep it warm in the background
+    app.state.report_refresher = asyncio.create_task(refresh_reports())
+    try:
+        yield
+    finally:
+        app.state.report_refresher.cancel()
+        with suppress(asyncio.CancelledError):
+            await app.state.report_refresher
+        app.state.db_executor.shutdown(wait=False)
+
+# orjson serializes the large forecast arrays much faster than the stdlib encoder
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+
+class PageGZipMiddleware(GZipMiddleware):
+    """Gzip responses except the MCP endpoints, whose event streams must not be buffered"""
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/mcp"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Pages and forecast JSON are highly repetitive, so compressing them cuts the bytes sent several-fold
+app.add_middleware(PageGZipMiddleware, minimum_size=500)
 
 # ===== MCP INTEGRATION =====
 # Initialize MCP with FastAPI app - exposes existing endpoints as MCP tools
@@ -35,6 +79,42 @@ request_counts = defaultdict(list)
 RATE_LIMIT_REQUESTS = 5  # 5 requests
 RATE_LIMIT_WINDOW = 3600  # per hour (3600 seconds)
 
+# surf_reports columns read by the page, API and MCP tool (everything else stays server-side)
+REPORT_COLUMNS = ','.join([
+    'spot_name', 'spot', 'timestamp', 'water_temp_f', 'wind_speed_mph', 'wind_mph',
+    'wind_direction_deg', 'stream_link', 'spot_config',
+    'wave_forecast_168h', 'wave_height_forecast', 'period_forecast_168h',
+    'tide_forecast_7d', 'tide_height_forecast',
+])
+
+# Latest report cache storage: known spot key (lowercase) -> (expires_at, row)
+# Only SURF_SPOTS keys are cached so arbitrary spot strings from clients can't grow it
+report_cache = {}
+REPORT_CACHE_TTL = 60  # seconds
+report_locks = defaultdict(asyncio.Lock)  # known spot keys only, like report_cache
+# Bumped on every invalidation so a query that was already in flight can't re-cache the pre-update row
+report_generations = defaultdict(int)
+report_cache_lock = threading.Lock()  # report_cache is written from DB threads and invalidated from the event loop
+REPORT_REFRESH_INTERVAL = 45  # seconds, shorter than the TTL so known spots never go cold
+# Reports change at most once per update, so browsers and proxies may reuse /api/get_report for the cache window
+REPORT_RESPONSE_HEADERS = {"Cache-Control": f"public, max-age={REPORT_CACHE_TTL}"}
+
+# Dedicated threads for blocking Supabase reads, so slow update jobs on the default executor can't starve them
+# (the pool itself lives on app.state for the lifetime of each app startup)
+DB_MAX_WORKERS = 16
+
+# Maximum number of spots updated in parallel by an update-all run
+UPDATE_CONCURRENCY = 4
+
+# In-flight background updates: spot (lowercase, None for all spots) -> asyncio.Task
+update_tasks = {}
+
+# Serialized /api/get_report bodies: known spot key (lowercase) -> (report timestamp, JSON bytes)
+report_json_cache = {}
+
+# Rendered spot pages: spot (lowercase) -> ((report timestamp, local date), HTML)
+page_cache = {}
+
 class SpotRequest(BaseModel):
     spot_name: str
     email: str
@@ -99,17 +179,18 @@ supabase: Client = create_client(
     os.getenv("SUPABASE_ANON_KEY")
 )
 
+# Local timezone for display, resolved once at import
+PST = ZoneInfo('America/Los_Angeles')
+
 # Load surf spots from CSV
 def get_pst_timestamp():
     """Get current timestamp in PST/PDT timezone"""
-    pst = pytz.timezone('America/Los_Angeles')
-    return datetime.now(pst)
+    return datetime.now(PST)
 
 def load_surf_spots():
     """Load surf spots from CSV file"""
     spots = {}
     try:
-        import csv
         with open('surf_spots.csv', 'r') as file:
             reader = csv.DictReader(file)
             for row in reader:
@@ -131,23 +212,207 @@ def load_surf_spots():
     return spots
 
 SURF_SPOTS = load_surf_spots()
+SURF_SPOTS_KEYS = tuple(SURF_SPOTS.keys())
+SURF_SPOTS_ITEMS = tuple(SURF_SPOTS.items())
+
+def build_dropdown_options(selected_spot: str) -> str:
+    """Build the spot dropdown <option> list with the given spot selected"""
+    return ''.join(
+        f'<option value="{spot_name}" {"selected" if spot_name == selected_spot else ""}>{spot_info.get("name", spot_name.title())}</option>'
+        for spot_name, spot_info in SURF_SPOTS_ITEMS
+    )
+
+# The spot list is static, so the dropdown HTML for each selected spot is built once
+DROPDOWN_OPTIONS_BY_SPOT = {spot_name: build_dropdown_options(spot_name) for spot_name in SURF_SPOTS_KEYS}
+
+def fetch_latest_report(spot: str, refresh: bool = False):
+    """Get the latest surf_reports row for a spot, served from the in-process cache while fresh (unless refresh is set)"""
+    cache_key = spot.lower()
+    cacheable = cache_key in SURF_SPOTS
+    cached = report_cache.get(cache_key) if cacheable else None
+    if not refresh and cached and cached[0] > time.monotonic():
+        return cached[1]
+    
+    generation = report_generations[cache_key] if cacheable else None
+    
+    logging.info(f"Querying Supabase for spot: {spot}")
+    result = None
+    spot_info = SURF_SPOTS.get(cache_key)
+    if spot_info:
+        # Reports are written with the canonical CSV name, so an exact match can use the spot_name index
+        result = supabase.table('surf_reports').select(REPORT_COLUMNS).eq('spot_name', spot_info['name']).order('timestamp', desc=True).limit(1).execute()
+    if not result or not result.data:
+        # Match spot_name (new column) or spot (old column) for compatibility - case insensitive, in one round-trip
+        quoted_spot = '"' + spot.replace('\\', '\\\\').replace('"', '\\"') + '"'
+        result = supabase.table('surf_reports').select(REPORT_COLUMNS).or_(f'spot_name.ilike.{quoted_spot},spot.ilike.{quoted_spot}').order('timestamp', desc=True).limit(1).execute()
+    
+    data = result.data[0] if result.data else None
+    if cacheable:
+        with report_cache_lock:
+            if report_generations[cache_key] == generation:
+                report_cache[cache_key] = (time.monotonic() + REPORT_CACHE_TTL, data)
+    return data
+
+async def run_db(func, *args):
+    """Run a blocking database call on the bounded DB thread pool"""
+    return await asyncio.get_running_loop().run_in_executor(app.state.db_executor, func, *args)
+
+async def get_latest_report(spot: str):
+    """Get the latest report without blocking the event loop, hitting the database in a worker thread on a cache miss"""
+    cache_key = spot.lower()
+    if cache_key not in SURF_SPOTS:
+        # Unknown spots are never cached, so there is no fill to share
+        return await run_db(fetch_latest_report, spot)
+    
+    cached = report_cache.get(cache_key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    
+    # One query per spot at a time - requests that raced on the miss wait for it and reuse the result
+    async with report_locks[cache_key]:
+        cached = report_cache.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        return await run_db(fetch_latest_report, spot)
+
+def invalidate_report_cache(spot: str):
+    """Drop a spot's cached report so the next read picks up freshly written data"""
+    cache_key = spot.lower()
+    if cache_key not in SURF_SPOTS:
+        return
+    with report_cache_lock:
+        report_generations[cache_key] += 1
+        report_cache.pop(cache_key, None)
+
+async def refresh_reports():
+    """Keep every known spot's report cached, re-reading each one before its cache entry expires"""
+    # Runs are scheduled by deadline, so the time spent querying doesn't stretch the cycle past the TTL
+    next_run = time.monotonic()
+    while True:
+        for spot_key in SURF_SPOTS_KEYS:
+            try:
+                await run_db(fetch_latest_report, spot_key, True)
+            except Exception as e:
+                logging.error(f"Error refreshing report for {spot_key}: {e}")
+        next_run = max(next_run + REPORT_REFRESH_INTERVAL, time.monotonic())
+        await asyncio.sleep(next_run - time.monotonic())
+def transform_report(data: Dict[str, Any], spot: str) -> Dict[str, Any]:
+    """Transform a surf_reports row into the shape used by the page, API and MCP tool"""
+    wave_forecast = data.get('wave_forecast_168h') or []
+    period_forecast = data.get('period_forecast_168h') or []
+    tide_forecast = data.get('tide_forecast_7d') or []
+    
+    return {
+        'spot': data.get('spot_name', data.get('spot', spot)),
+        'timestamp': data.get('timestamp'),
+        'water_temp_f': data.get('water_temp_f'),
+        'wind_speed_mph': data.get('wind_speed_mph', data.get('wind_mph')),
+        'wind_direction_deg': data.get('wind_direction_deg'),
+        'stream_link': data.get('stream_link'),
+        'spot_config': data.get('spot_config', {}),
+        
+        # Wave data
+        'wave_forecast_168h': data.get('wave_forecast_168h', []),
+        'wave_height_forecast': data.get('wave_height_forecast', []),
+        
+        # Period data  
+        'period_forecast_168h': data.get('period_forecast_168h', []),
+        
+        # Tide data
+        'tide_forecast_7d': data.get('tide_forecast_7d', []),
+        'tide_height_forecast': data.get('tide_height_forecast', []),
+        
+        # Current conditions (extract from forecast data) - round to 1 decimal
+        'current_wave_height': round(wave_forecast[0][2], 1) if wave_forecast else 'Loading...',  # avg from first entry
+        'current_period': round(period_forecast[0][0], 1) if period_forecast else 'Loading...',  # period from first entry
+        'current_tide_height': round(tide_forecast[0][0], 1) if tide_forecast else 'Loading...'  # height from first entry
+    }
+
+# Current condition fields: (source key, display key, decimal places)
+CURRENT_CONDITIONS_SPEC = (
+    ('current_wave_height', 'wave_height', 1),
+    ('current_tide_height', 'tide_height', 1),
+    ('water_temp_f', 'water_temp', 1),
+    ('wind_speed_mph', 'wind_speed', 1),
+    ('wind_direction_deg', 'wind_direction', 0),
+    ('current_period', 'period', 1),
+)
 
 def get_current_conditions(data: Dict[str, Any]) -> Dict[str, Any]:
     """Extract current conditions from forecast data"""
     current = {}
     
-    # Get current conditions from the new data structure - round to 1 decimal place
-    current['wave_height'] = round(data.get('current_wave_height'), 1) if isinstance(data.get('current_wave_height'), (int, float)) else data.get('current_wave_height', 'Loading...')
-    current['tide_height'] = round(data.get('current_tide_height'), 1) if isinstance(data.get('current_tide_height'), (int, float)) else data.get('current_tide_height', 'Loading...')
-    current['water_temp'] = round(data.get('water_temp_f'), 1) if isinstance(data.get('water_temp_f'), (int, float)) else data.get('water_temp_f', 'Loading...')
-    current['wind_speed'] = round(data.get('wind_speed_mph'), 1) if isinstance(data.get('wind_speed_mph'), (int, float)) else data.get('wind_speed_mph', 'Loading...')
-    current['wind_direction'] = round(data.get('wind_direction_deg'), 0) if isinstance(data.get('wind_direction_deg'), (int, float)) else data.get('wind_direction_deg', 'Loading...')
-    current['period'] = round(data.get('current_period'), 1) if isinstance(data.get('current_period'), (int, float)) else data.get('current_period', 'Loading...')
+    # Get current conditions from the new data structure - round numbers, 'Loading...' when missing
+    for source_key, display_key, ndigits in CURRENT_CONDITIONS_SPEC:
+        value = data.get(source_key)
+        if isinstance(value, (int, float)):
+            current[display_key] = round(value, ndigits)
+        else:
+            current[display_key] = value if value is not None else 'Loading...'
     
     return current
 
-def get_html_template(spot: str, data: Dict[str, Any]) -> str:
-    """Generate HTML page for a surf spot"""
+# Placeholders in static/index.html, split out of the template once when it is compiled
+TEMPLATE_PLACEHOLDERS = (
+    '{spot_title}', '{dropdown_options}', '{stream_link_html}', '{wave_height}', '{period}',
+    '{tide_height}', '{tide_direction}', '{tide_status}', '{tide_time}', '{wind_speed}',
+    '{wind_direction}', '{water_temp}', '{last_updated}',
+    'WAVE_DATA_PLACEHOLDER', 'PERIOD_DATA_PLACEHOLDER', 'TIDE_DATA_PLACEHOLDER',
+    'TIDE_LABELS_PLACEHOLDER', 'DAILY_LABELS_PLACEHOLDER',
+)
+# Capturing group so re.split keeps the placeholder names between the literal segments
+TEMPLATE_PLACEHOLDER_PATTERN = re.compile('(' + '|'.join(re.escape(p) for p in TEMPLATE_PLACEHOLDERS) + ')')
+
+@lru_cache(maxsize=1)
+def load_html_template() -> str:
+    """Read the spot page template from disk once and reuse it for every render"""
+    with open('static/index.html', 'r') as f:
+        return f.read()
+
+@lru_cache(maxsize=1)
+def compile_html_template() -> tuple:
+    """Split the template into literal segments and the placeholder slots between them"""
+    parts = TEMPLATE_PLACEHOLDER_PATTERN.split(load_html_template())
+    return tuple(parts[0::2]), tuple(parts[1::2])
+
+def render_html_template(replacements: Dict[str, str]) -> str:
+    """Render the precompiled template by joining its segments with the per-request values"""
+    segments, slots = compile_html_template()
+    parts = [segments[0]]
+    append = parts.append
+    for slot, segment in zip(slots, segments[1:]):
+        append(replacements[slot])
+        append(segment)
+    return ''.join(parts)
+
+
+@lru_cache(maxsize=2)
+def get_daily_labels(today: date) -> list:
+    """Chart x-axis labels for the 7 days starting at the given local date"""
+    daily_labels = []
+    for i in range(7):
+        day = today + timedelta(days=i)
+        if i == 0:
+            daily_labels.append("Today")
+        elif i == 1:
+            daily_labels.append("Tomorrow")
+        else:
+            daily_labels.append(day.strftime("%m/%d"))
+    return daily_labels
+
+@lru_cache(maxsize=512)
+def parse_tide_datetime(value):
+    """Parse a stored tide datetime (ISO string written by the updater) into a datetime, memoized per string"""
+    if not isinstance(value, str):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        # Fall back to the lenient parser for non-ISO formats
+        return dateutil_parser.parse(value)
+
+def get_html_template(spot_key: str, data: Dict[str, Any]) -> str:
+    """Generate HTML page for a surf spot (spot_key is the lowercase SURF_SPOTS key)"""
     current = get_current_conditions(data)
     wave_height = current['wave_height']
     tide_height = current['tide_height'] 
@@ -161,10 +426,8 @@ def get_html_template(spot: str, data: Dict[str, Any]) -> str:
     if db_timestamp:
         try:
             # Parse ISO timestamp from database, convert to PST, and format for display
-            from datetime import datetime
             timestamp_dt = datetime.fromisoformat(db_timestamp.replace('Z', '+00:00'))
-            pst = pytz.timezone('America/Los_Angeles')
-            pst_timestamp = timestamp_dt.astimezone(pst)
+            pst_timestamp = timestamp_dt.astimezone(PST)
             formatted_timestamp = pst_timestamp.strftime('%I:%M %p PST on %B %d, %Y')
         except (ValueError, AttributeError):
             # Fallback to current time if parsing fails
@@ -177,51 +440,20 @@ def get_html_template(spot: str, data: Dict[str, Any]) -> str:
     stream_link = data.get('stream_link')
     
     # Prepare simple chart data
-    wave_forecast_168h = data.get('wave_forecast_168h', [])
-    period_forecast_168h = data.get('period_forecast_168h', [])
-    tide_forecast_7d = data.get('tide_forecast_7d', [])
-    
-    # Extract simple data arrays for charts (first 56 points = 7 days)
-    wave_chart_data = []
-    if wave_forecast_168h:
-        for entry in wave_forecast_168h[:56]:  # 7 days of 3-hour intervals
-            if len(entry) >= 3:
-                wave_chart_data.append(entry[2])  # avg wave height
-    
-    period_chart_data = []
-    if period_forecast_168h:
-        for entry in period_forecast_168h[:56]:  # 7 days
-            if len(entry) >= 2:
-                period_chart_data.append(entry[0])  # period
-    
-    tide_chart_data = []
-    if tide_forecast_7d:
-        for entry in tide_forecast_7d:  # All tide events
-            if len(entry) >= 1:
-                tide_chart_data.append(entry[0])  # tide height
-    
-    # Create daily labels for x-axis (7 days)
-    from datetime import datetime, timedelta
-    daily_labels = []
-    for i in range(7):
-        date = get_pst_timestamp() + timedelta(days=i)
-        if i == 0:
-            daily_labels.append("Today")
-        elif i == 1:
-            daily_labels.append("Tomorrow")
-        else:
-            daily_labels.append(date.strftime("%m/%d"))
+    wave_forecast_168h = data.get('wave_forecast_168h') or []
+    period_forecast_168h = data.get('period_forecast_168h') or []
+    tide_forecast_7d = data.get('tide_forecast_7d') or []
     
-    # Create dropdown options
-    dropdown_options = ""
-    for spot_name, spot_info in SURF_SPOTS.items():
-        selected = "selected" if spot_name == spot.lower() else ""
-        display_name = spot_info.get('name', spot_name.title())
-        dropdown_options += f'<option value="{spot_name}" {selected}>{display_name}</option>'
+    # Extract simple data arrays for charts (first 56 points = 7 days of 3-hour intervals)
+    wave_chart_data = [entry[2] for entry in wave_forecast_168h[:56] if len(entry) >= 3]  # avg wave height
+    period_chart_data = [entry[0] for entry in period_forecast_168h[:56] if len(entry) >= 2]  # period
+    tide_chart_data = [entry[0] for entry in tide_forecast_7d if len(entry) >= 1]  # tide height, all tide events
     
-    # Read HTML template
-    with open('static/index.html', 'r') as f:
-        template = f.read()
+    # Create daily labels for x-axis (7 days) - only change at local midnight
+    daily_labels = get_daily_labels(get_pst_timestamp().date())
+    
+    # Dropdown options are prebuilt per spot at startup
+    dropdown_options = DROPDOWN_OPTIONS_BY_SPOT.get(spot_key) or build_dropdown_options(spot_key)
     
     # Calculate tide direction and next tide info
     tide_direction = "→"  # Default
@@ -246,20 +478,14 @@ def get_html_template(spot: str, data: Dict[str, Any]) -> str:
             next_tide_datetime = tide_forecast_7d[1][2]  # datetime from second entry
             
             tide_status = next_tide_type
-            if isinstance(next_tide_datetime, str):
-                # Parse datetime string if needed
-                from dateutil import parser
-                next_tide_datetime = parser.parse(next_tide_datetime)
+            next_tide_datetime = parse_tide_datetime(next_tide_datetime)
             tide_time = next_tide_datetime.strftime('%I:%M %p')
             
             # Create tide labels for chart hover (time labels)
             tide_labels = []
             for entry in tide_forecast_7d:
                 if len(entry) >= 3:
-                    tide_dt = entry[2]
-                    if isinstance(tide_dt, str):
-                        from dateutil import parser
-                        tide_dt = parser.parse(tide_dt)
+                    tide_dt = parse_tide_datetime(entry[2])
                     tide_labels.append(tide_dt.strftime('%m/%d %I:%M %p'))
                     
         except Exception as e:
@@ -268,88 +494,68 @@ def get_html_template(spot: str, data: Dict[str, Any]) -> str:
     # Replace placeholders
     stream_link_html = f'<p class="text-blue-600 mt-2"><a href="{stream_link}" target="_blank" class="underline hover:text-blue-800">📹 Live Stream</a></p>' if stream_link else ''
     
-    # Use string replacement instead of .format() to avoid conflicts with JavaScript
-    html = template.replace('{spot_title}', spot.title())
-    html = html.replace('{dropdown_options}', dropdown_options)
-    html = html.replace('{stream_link_html}', stream_link_html)
-    html = html.replace('{wave_height}', str(wave_height))
-    html = html.replace('{period}', str(period))
-    html = html.replace('{tide_height}', str(tide_height))
-    html = html.replace('{tide_direction}', tide_direction)
-    html = html.replace('{tide_status}', tide_status)
-    html = html.replace('{tide_time}', tide_time)
-    html = html.replace('{wind_speed}', str(wind_speed))
-    html = html.replace('{wind_direction}', str(wind_direction))
-    html = html.replace('{water_temp}', str(water_temp))
-    html = html.replace('{last_updated}', formatted_timestamp)
-    
-    # Replace chart data placeholders with JSON data
-    import json
-    html = html.replace('WAVE_DATA_PLACEHOLDER', json.dumps(wave_chart_data))
-    html = html.replace('PERIOD_DATA_PLACEHOLDER', json.dumps(period_chart_data))
-    html = html.replace('TIDE_DATA_PLACEHOLDER', json.dumps(tide_chart_data))
-    html = html.replace('TIDE_LABELS_PLACEHOLDER', json.dumps(tide_labels))
-    html = html.replace('DAILY_LABELS_PLACEHOLDER', json.dumps(daily_labels))
+    # Substitute every placeholder in a single pass (not .format(), to avoid conflicts with JavaScript)
+    replacements = {
+        '{spot_title}': spot_key.title(),
+        '{dropdown_options}': dropdown_options,
+        '{stream_link_html}': stream_link_html,
+        '{wave_height}': str(wave_height),
+        '{period}': str(period),
+        '{tide_height}': str(tide_height),
+        '{tide_direction}': tide_direction,
+        '{tide_status}': tide_status,
+        '{tide_time}': tide_time,
+        '{wind_speed}': str(wind_speed),
+        '{wind_direction}': str(wind_direction),
+        '{water_temp}': str(water_temp),
+        '{last_updated}': formatted_timestamp,
+        
+        # Chart data placeholders are replaced with JSON data
+        'WAVE_DATA_PLACEHOLDER': orjson.dumps(wave_chart_data).decode(),
+        'PERIOD_DATA_PLACEHOLDER': orjson.dumps(period_chart_data).decode(),
+        'TIDE_DATA_PLACEHOLDER': orjson.dumps(tide_chart_data).decode(),
+        'TIDE_LABELS_PLACEHOLDER': orjson.dumps(tide_labels).decode(),
+        'DAILY_LABELS_PLACEHOLDER': orjson.dumps(daily_labels).decode(),
+    }
+    html = render_html_template(replacements)
     
     return html
 
 @app.get("/")
 async def root():
     """Redirect to random surf spot"""
-    random_spot = random.choice(list(SURF_SPOTS.keys()))
+    random_spot = random.choice(SURF_SPOTS_KEYS)
     return RedirectResponse(url=f"/{random_spot}")
 
-@app.get("/{spot}", response_class=HTMLResponse)
+# Registered after mcp.mount() at the bottom of the file so this catch-all can't shadow /mcp
 async def get_spot_page(spot: str):
     """Get surf spot page"""
-    if spot.lower() not in SURF_SPOTS:
+    # Normalize once at the edge and pass the key through
+    spot_key = spot.lower()
+    if spot_key not in SURF_SPOTS:
         raise HTTPException(status_code=404, detail="Surf spot not found")
     
+    render_key = None
+    
     # Get latest data using the updated get_report logic
     try:
-        logging.info(f"Querying Supabase for spot: {spot}")
-        result = supabase.table('surf_reports').select('*').ilike('spot_name', spot).order('timestamp', desc=True).limit(1).execute()
-        logging.info(f"Query result for spot_name ilike {spot}: {len(result.data) if result.data else 0} records")
+        data = await get_latest_report(spot_key)
         
-        if not result.data:
-            # Fallback to old 'spot' column if spot_name doesn't have data
-            logging.info(f"Trying fallback query with spot ilike {spot}")
-            result = supabase.table('surf_reports').select('*').ilike('spot', spot).order('timestamp', desc=True).limit(1).execute()
-            logging.info(f"Fallback query result for spot ilike {spot}: {len(result.data) if result.data else 0} records")
+        if data:
+            # The page is fully determined by the report and (for the chart day labels) the local date
+            if data.get('timestamp'):
+                render_key = (data['timestamp'], get_pst_timestamp().date())
+                cached = page_cache.get(spot_key)
+                if cached and cached[0] == render_key:
+                    return cached[1]
             
-        if result.data:
-            data = result.data[0]
             logging.info(f"Found data for {spot}: keys={list(data.keys())}")
             logging.info(f"Sample data: wave_forecast_168h length={len(data.get('wave_forecast_168h', []))}")
             logging.info(f"Sample data: water_temp_f={data.get('water_temp_f')}")
             logging.info(f"Sample data: wind_speed_mph={data.get('wind_speed_mph')}")
             
             # Transform data for frontend compatibility (same as get_report)
-            transformed_data = {
-                'spot': data.get('spot_name', data.get('spot', spot)),
-                'timestamp': data.get('timestamp'),
-                'water_temp_f': data.get('water_temp_f'),
-                'wind_speed_mph': data.get('wind_speed_mph', data.get('wind_mph')),
-                'wind_direction_deg': data.get('wind_direction_deg'),
-                'stream_link': data.get('stream_link'),
-                'spot_config': data.get('spot_config', {}),
-                
-                # Wave data
-                'wave_forecast_168h': data.get('wave_forecast_168h', []),
-                'wave_height_forecast': data.get('wave_height_forecast', []),
-                
-                # Period data  
-                'period_forecast_168h': data.get('period_forecast_168h', []),
-                
-                # Tide data
-                'tide_forecast_7d': data.get('tide_forecast_7d', []),
-                'tide_height_forecast': data.get('tide_height_forecast', []),
-                
-                # Current conditions (extract from forecast data) - round to 1 decimal
-                'current_wave_height': round(data.get('wave_forecast_168h')[0][2], 1) if data.get('wave_forecast_168h') and len(data.get('wave_forecast_168h')) > 0 else 'Loading...',  # avg from first entry
-                'current_period': round(data.get('period_forecast_168h')[0][0], 1) if data.get('period_forecast_168h') and len(data.get('period_forecast_168h')) > 0 else 'Loading...',  # period from first entry
-                'current_tide_height': round(data.get('tide_forecast_7d')[0][0], 1) if data.get('tide_forecast_7d') and len(data.get('tide_forecast_7d')) > 0 else 'Loading...'  # height from first entry
-            }
+            transformed_data = transform_report(data, spot)
         else:
             # Only log warning if both queries failed (no data actually found)
             transformed_data = {}
@@ -357,48 +563,32 @@ async def get_spot_page(spot: str):
         logging.error(f"Database error: {e}")
         transformed_data = {}
     
-    return get_html_template(spot, transformed_data)
+    html = get_html_template(spot_key, transformed_data)
+    if render_key:
+        page_cache[spot_key] = (render_key, html)
+    return html
 
 @app.get("/api/get_report")
 async def get_report(spot: str):
     """Get latest surf report for a spot"""
     try:
-        # Query by spot_name (new column) first, fallback to spot (old column) for compatibility - case insensitive
-        result = supabase.table('surf_reports').select('*').ilike('spot_name', spot).order('timestamp', desc=True).limit(1).execute()
-        if not result.data:
-            # Fallback to old 'spot' column if spot_name doesn't have data
-            result = supabase.table('surf_reports').select('*').ilike('spot', spot).order('timestamp', desc=True).limit(1).execute()
-        if result.data:
-            data = result.data[0]
+        data = await get_latest_report(spot)
+        if data:
+            # Reuse the serialized body while the underlying report hasn't changed (known spots with a timestamp only)
+            cache_key = spot.lower()
+            timestamp = data.get('timestamp')
+            cacheable = timestamp and cache_key in SURF_SPOTS
+            cached = report_json_cache.get(cache_key) if cacheable else None
+            if cached and cached[0] == timestamp:
+                return Response(content=cached[1], media_type="application/json", headers=REPORT_RESPONSE_HEADERS)
             
             # Transform data for frontend compatibility
-            transformed_data = {
-                'spot': data.get('spot_name', data.get('spot', spot)),
-                'timestamp': data.get('timestamp'),
-                'water_temp_f': data.get('water_temp_f'),
-                'wind_speed_mph': data.get('wind_speed_mph', data.get('wind_mph')),
-                'wind_direction_deg': data.get('wind_direction_deg'),
-                'stream_link': data.get('stream_link'),
-                'spot_config': data.get('spot_config', {}),
-                
-                # Wave data
-                'wave_forecast_168h': data.get('wave_forecast_168h', []),
-                'wave_height_forecast': data.get('wave_height_forecast', []),
-                
-                # Period data  
-                'period_forecast_168h': data.get('period_forecast_168h', []),
-                
-                # Tide data
-                'tide_forecast_7d': data.get('tide_forecast_7d', []),
-                'tide_height_forecast': data.get('tide_height_forecast', []),
-                
-                # Current conditions (extract from forecast data) - round to 1 decimal
-                'current_wave_height': round(data.get('wave_forecast_168h')[0][2], 1) if data.get('wave_forecast_168h') and len(data.get('wave_forecast_168h')) > 0 else 'Loading...',  # avg from first entry
-                'current_period': round(data.get('period_forecast_168h')[0][0], 1) if data.get('period_forecast_168h') and len(data.get('period_forecast_168h')) > 0 else 'Loading...',  # period from first entry
-                'current_tide_height': round(data.get('tide_forecast_7d')[0][0], 1) if data.get('tide_forecast_7d') and len(data.get('tide_forecast_7d')) > 0 else 'Loading...'  # height from first entry
-            }
+            transformed_data = transform_report(data, spot)
             
-            return transformed_data
+            body = orjson.dumps(transformed_data, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+            if cacheable:
+                report_json_cache[cache_key] = (timestamp, body)
+            return Response(content=body, media_type="application/json", headers=REPORT_RESPONSE_HEADERS)
         else:
             return {"error": "No data available", "spot": spot}
     except Exception as e:
@@ -406,11 +596,9 @@ async def get_report(spot: str):
         raise HTTPException(status_code=500, detail="Database error")
 
 async def _update_spot_background(spot_name: str = None):
-    """Background task to update surf spot data"""
-    try:
-        from surf_reports.surf_report_update_spot import update_spot_to_supabase
-    except ImportError as e:
-        logging.error(f"surf_reports module not available: {e}")
+    """Background task to update surf spot data (blocking fetches run in a worker thread)"""
+    if update_spot_to_supabase is None:
+        logging.error("surf_reports module not available")
         return
     
     if not spot_name:
@@ -419,22 +607,31 @@ async def _update_spot_background(spot_name: str = None):
             total_success = 0
             total_failed = 0
             
-            for spot_key, spot_info in SURF_SPOTS.items():
-                try:
+            # Update spots concurrently, bounded so we don't hammer the NOAA/Supabase APIs
+            semaphore = asyncio.Semaphore(UPDATE_CONCURRENCY)
+            
+            async def update_one(spot_info):
+                async with semaphore:
                     logging.info(f"Updating spot: {spot_info['name']}")
-                    result = update_spot_to_supabase(spot_info['name'])
-                    
-                    if result["status"] == "success":
-                        total_success += 1
-                        logging.info(f"Successfully updated surf spot: {spot_info['name']}")
-                    else:
-                        total_failed += 1
-                        logging.error(f"Failed to update surf spot {spot_info['name']}: {result['message']}")
-                    
-                except Exception as e:
+                    return await asyncio.to_thread(update_spot_to_supabase, spot_info['name'])
+            
+            results = await asyncio.gather(
+                *(update_one(spot_info) for spot_key, spot_info in SURF_SPOTS_ITEMS),
+                return_exceptions=True
+            )
+            
+            for (spot_key, spot_info), result in zip(SURF_SPOTS_ITEMS, results):
+                if isinstance(result, Exception):
                     total_failed += 1
-                    error_msg = f"Error updating spot {spot_info['name']}: {str(e)}"
+                    error_msg = f"Error updating spot {spot_info['name']}: {str(result)}"
                     logging.error(error_msg)
+                elif result["status"] == "success":
+                    total_success += 1
+                    invalidate_report_cache(spot_key)
+                    logging.info(f"Successfully updated surf spot: {spot_info['name']}")
+                else:
+                    total_failed += 1
+                    logging.error(f"Failed to update surf spot {spot_info['name']}: {result['message']}")
             
             logging.info(f"Background update completed: {total_success} successful, {total_failed} failed")
             
@@ -444,9 +641,10 @@ async def _update_spot_background(spot_name: str = None):
     else:
         # Single spot specified
         try:
-            result = update_spot_to_supabase(spot_name)
+            result = await asyncio.to_thread(update_spot_to_supabase, spot_name)
             
             if result["status"] == "success":
+                invalidate_report_cache(spot_name)
                 logging.info(f"Successfully updated surf spot: {spot_name}")
             else:
                 logging.error(f"Failed to update surf spot {spot_name}: {result['message']}")
@@ -454,17 +652,30 @@ async def _update_spot_background(spot_name: str = None):
         except Exception as e:
             logging.error(f"Error updating spot {spot_name}: {e}")
 
+def forget_update_task(task_key, task):
+    """Drop a finished update task, unless a newer update for the same key has already replaced it"""
+    if update_tasks.get(task_key) is task:
+        del update_tasks[task_key]
+
 @app.post("/api/update_spot")
 @app.get("/api/update_spot")
 async def update_spot(request: Request):
     """Kick off surf spot data update - supports ?spot=spotname query parameter or updates all spots if no spot specified"""
-    import asyncio
-    
     # Get spot from query parameter
     spot_name = request.query_params.get('spot')
     
-    # Start the background task without awaiting it
-    asyncio.create_task(_update_spot_background(spot_name))
+    # Coalesce repeat triggers onto the update that is already running
+    task_key = spot_name.lower() if spot_name else None
+    running = update_tasks.get(task_key)
+    if running and not running.done():
+        if spot_name:
+            return {"message": f"Update already in progress for spot: {spot_name}"}
+        return {"message": "Update already in progress for all spots"}
+    
+    # Start the background task without awaiting it (kept referenced until it finishes)
+    task = asyncio.create_task(_update_spot_background(spot_name))
+    update_tasks[task_key] = task
+    task.add_done_callback(partial(forget_update_task, task_key))
     
     # Return immediate response
     if spot_name:
@@ -495,9 +706,9 @@ async def new_spot_request(request: Request, spot_request: SpotRequest):
         
         # Check for duplicate recent requests (same email within 24 hours)
         twenty_four_hours_ago = get_pst_timestamp() - timedelta(hours=24)
-        existing_requests = supabase.table('spot_requests').select("*").eq(
+        existing_requests = await run_db(supabase.table('spot_requests').select("*").eq(
             'email', str(spot_request.email)
-        ).gte('timestamp', twenty_four_hours_ago.isoformat()).execute()
+        ).gte('timestamp', twenty_four_hours_ago.isoformat()).execute)
         
         if existing_requests.data and len(existing_requests.data) > 0:
             raise HTTPException(
@@ -506,11 +717,11 @@ async def new_spot_request(request: Request, spot_request: SpotRequest):
             )
         
         # Insert request into database
-        result = supabase.table('spot_requests').insert({
+        result = await run_db(supabase.table('spot_requests').insert({
             "email": str(spot_request.email),
             "spot_name": spot_request.spot_name.strip(),
             # Let database handle timestamp with default now()
-        }).execute()
+        }).execute)
         
         if result.data:
             logging.info(f"New spot request: {spot_request.spot_name} from {spot_request.email} (IP: {client_ip})")
@@ -549,40 +760,10 @@ async def get_surf_report(spot: str) -> dict:
         spot: Name of the surf spot (e.g., 'tamarack', 'blacks', 'scripps')
     """
     try:
-        # Query by spot_name (new column) first, fallback to spot (old column) for compatibility - case insensitive
-        result = supabase.table('surf_reports').select('*').ilike('spot_name', spot).order('timestamp', desc=True).limit(1).execute()
-        if not result.data:
-            # Fallback to old 'spot' column if spot_name doesn't have data
-            result = supabase.table('surf_reports').select('*').ilike('spot', spot).order('timestamp', desc=True).limit(1).execute()
-        if result.data:
-            data = result.data[0]
-            
+        data = await get_latest_report(spot)
+        if data:
             # Transform data for compatibility (same logic as HTTP endpoint)
-            transformed_data = {
-                'spot': data.get('spot_name', data.get('spot', spot)),
-                'timestamp': data.get('timestamp'),
-                'water_temp_f': data.get('water_temp_f'),
-                'wind_speed_mph': data.get('wind_speed_mph', data.get('wind_mph')),
-                'wind_direction_deg': data.get('wind_direction_deg'),
-                'stream_link': data.get('stream_link'),
-                'spot_config': data.get('spot_config', {}),
-                
-                # Wave data
-                'wave_forecast_168h': data.get('wave_forecast_168h', []),
-                'wave_height_forecast': data.get('wave_height_forecast', []),
-                
-                # Period data  
-                'period_forecast_168h': data.get('period_forecast_168h', []),
-                
-                # Tide data
-                'tide_forecast_7d': data.get('tide_forecast_7d', []),
-                'tide_height_forecast': data.get('tide_height_forecast', []),
-                
-                # Current conditions (extract from forecast data) - round to 1 decimal
-                'current_wave_height': round(data.get('wave_forecast_168h')[0][2], 1) if data.get('wave_forecast_168h') and len(data.get('wave_forecast_168h')) > 0 else 'Loading...',  # avg from first entry
-                'current_period': round(data.get('period_forecast_168h')[0][0], 1) if data.get('period_forecast_168h') and len(data.get('period_forecast_168h')) > 0 else 'Loading...',  # period from first entry
-                'current_tide_height': round(data.get('tide_forecast_7d')[0][0], 1) if data.get('tide_forecast_7d') and len(data.get('tide_forecast_7d')) > 0 else 'Loading...'  # height from first entry
-            }
+            transformed_data = transform_report(data, spot)
             
             return transformed_data
         else:
@@ -591,8 +772,26 @@ async def get_surf_report(spot: str) -> dict:
         logging.error(f"MCP get_report error: {e}")
         return {"error": str(e), "spot": spot}
 
+# Mount MCP server to the FastAPI app at /mcp endpoint - done at import so every worker process serves it
+mcp.mount()
+
+# The spot page catch-all goes last, after the /mcp routes, since routes match in registration order
+app.add_api_route("/{spot}", get_spot_page, methods=["GET"], response_class=HTMLResponse)
+
 if __name__ == "__main__":
-    # Mount MCP server to the FastAPI app at /mcp endpoint
-    mcp.mount()
-    
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Opt-in only: each worker has its own rate limits, report refresher and update coalescing,
+    # so this deliberately ignores host-provided settings like WEB_CONCURRENCY
+    workers = int(os.getenv("DUCKDIVE_WORKERS", "1"))
+    if workers > 1:
+        logging.warning(f"Running {workers} workers - rate limits and update coalescing are per worker")
+    
+    # Per-request access logging and proxy header rewriting are pure overhead here;
+    # get_client_ip reads X-Forwarded-For itself
+    uvicorn.run(
+        "main:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        access_log=False,
+        proxy_headers=False
+    )
\ No newline at end of file
@@ -1,34 +1,28 @@
 import sys
-import matplotlib.pyplot as plt
 import surfpy
 
-def get_period_forecast(wave_location, num_hours_to_forecast):
+try:
+    from .surf_report_wave_height import fetch_wave_data
+except ImportError:
+    # Run directly as a script rather than as part of the surf_reports package
+    from surf_report_wave_height import fetch_wave_data
+
+def get_period_forecast(wave_location, num_hours_to_forecast, wave_data=None):
     """
     Get wave period forecast data for a given location and time period.
     
     Args:
         wave_location: surfpy.Location object with depth, angle, and slope set
         num_hours_to_forecast: Number of hours to forecast (e.g., 168 for 7 days)
+        wave_data: Optional processed wave data (from fetch_wave_data) to reuse instead of fetching again
     
     Returns:
         List of tuples: [(period_seconds, hour_#), ...] for each hour from 0 to num_hours_to_forecast
     """
-    global_wave_model = surfpy.us_west_coast_gfs_wave_model()
-
-    print('Fetching GFS Wave Data for period forecast')
-    wave_grib_data = global_wave_model.fetch_grib_datas(0, num_hours_to_forecast, wave_location)
-    raw_wave_data = global_wave_model.parse_grib_datas(wave_location, wave_grib_data)
-    if raw_wave_data:
-        data = global_wave_model.to_buoy_data(raw_wave_data)
-    else:
-        print('Failed to fetch wave forecast data')
+    data = wave_data if wave_data is not None else fetch_wave_data(wave_location, num_hours_to_forecast)
+    if not data:
         return None
 
-    # Process the wave data
-    for dat in data:
-        dat.solve_breaking_wave_heights(wave_location)
-        dat.change_units(surfpy.units.Units.english)
-
     # Extract period data
     periods = [x.wave_summary.period for x in data]
     times = [x.date for x in data]
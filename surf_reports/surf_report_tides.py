@@ -1,7 +1,42 @@
 import sys
 import datetime
+import threading
 import surfpy
 
+# NOAA tide stations keyed by station_id - the list is static, so fetch it once per process
+_tide_stations_by_id = None
+_tide_stations_lock = threading.Lock()
+
+def get_tide_station(station_id):
+    """
+    Look up a NOAA tide station by ID, fetching the station list on first use.
+    
+    Args:
+        station_id: NOAA tide station ID (e.g., '9410230' for La Jolla)
+    
+    Returns:
+        surfpy.TideStation or None if not found
+    """
+    global _tide_stations_by_id
+    stations_by_id = _tide_stations_by_id
+    if stations_by_id is None:
+        # Concurrent spot updates share one download of the station list
+        with _tide_stations_lock:
+            stations_by_id = _tide_stations_by_id
+            if stations_by_id is None:
+                stations = surfpy.TideStations()
+                fetched = stations.fetch_stations()
+                stations_by_id = {
+                    getattr(s, 'station_id', ''): s for s in stations.stations
+                }
+                # Only keep a successful, non-empty list - otherwise the next update retries the fetch
+                if fetched is not False and stations_by_id:
+                    _tide_stations_by_id = stations_by_id
+                else:
+                    print("Failed to fetch tide stations, will retry on the next update")
+    
+    return stations_by_id.get(station_id)
+
 def get_tide_forecast(station_id):
     """
     Get 7-day tide forecast for a given station.
@@ -15,15 +50,7 @@ def get_tide_forecast(station_id):
     """
     try:
         print(f"Fetching tide data for station {station_id}...")
-        stations = surfpy.TideStations()
-        stations.fetch_stations()
-        
-        # Find the station in the list
-        station = None
-        for s in stations.stations:
-            if getattr(s, 'station_id', '') == station_id:
-                station = s
-                break
+        station = get_tide_station(station_id)
         
         if not station:
             print(f"Station {station_id} not found")
@@ -1,15 +1,15 @@
 import surfpy
-import matplotlib.pyplot as plt
 import csv
 import datetime
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
 # Load environment variables from .env file
 load_dotenv()
-from .surf_report_wave_height import get_surf_forecast
+from .surf_report_wave_height import get_surf_forecast, fetch_wave_data
 from .surf_report_water_temperature import get_water_temp_forecast
 from .surf_report_winds import get_current_wind
 from .surf_report_tides import get_tide_forecast
@@ -51,6 +51,14 @@ def get_surf_spot_data(spot_name, csv_file="surf_spots.csv"):
         print(f"Error reading surf spots CSV: {e}")
         return None
 
+def _future_result(future, label):
+    """Return the result of a fetch future, or None if the fetch raised"""
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"Error fetching {label}: {e}")
+        return None
+
 def get_complete_surf_report(spot_name):
     """
     Get complete surf report data for a given surf spot that can be stored in database.
@@ -83,21 +91,21 @@ def get_complete_surf_report(spot_name):
     # Set forecast parameters
     num_hours_to_forecast = 168  # 7 day forecast
     
-    # Get all forecast data
-    print("Fetching wave height forecast...")
-    wave_forecast = get_surf_forecast(wave_location, num_hours_to_forecast)
-    
-    print("Fetching wave period forecast...")
-    period_forecast = get_period_forecast(wave_location, num_hours_to_forecast)
+    # Get all forecast data - the fetches are independent network calls, so run them concurrently
+    print("Fetching wave model, water temperature, wind and tide data...")
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        wave_data_future = executor.submit(fetch_wave_data, wave_location, num_hours_to_forecast)
+        water_temp_future = executor.submit(get_water_temp_forecast, wave_location, 1)
+        wind_future = executor.submit(get_current_wind, wave_location)
+        tide_future = executor.submit(get_tide_forecast, str(spot_data['closest_tide']))
     
-    print("Fetching water temperature...")
-    water_temp_data = get_water_temp_forecast(wave_location, 1)
-    
-    print("Fetching current wind...")
-    wind_data = get_current_wind(wave_location)
-    
-    print("Fetching tide forecast...")
-    tide_forecast = get_tide_forecast(str(spot_data['closest_tide']))
+    # Wave height and period come from the same GFS wave data - fetch once, derive both
+    wave_data = _future_result(wave_data_future, "wave model data")
+    wave_forecast = get_surf_forecast(wave_location, num_hours_to_forecast, wave_data) if wave_data else None
+    period_forecast = get_period_forecast(wave_location, num_hours_to_forecast, wave_data) if wave_data else None
+    water_temp_data = _future_result(water_temp_future, "water temperature")
+    wind_data = _future_result(wind_future, "current wind")
+    tide_forecast = _future_result(tide_future, "tide forecast")
     
     # Build the complete data structure for database
     report_data = {
@@ -119,8 +127,15 @@ def get_complete_surf_report(spot_name):
     
     return report_data
 
+# Shared Supabase client - created once and reused across updates
+_supabase_client = None
+
 def get_supabase_client():
-    """Initialize Supabase client with environment variables"""
+    """Initialize Supabase client with environment variables (cached after first call)"""
+    global _supabase_client
+    if _supabase_client is not None:
+        return _supabase_client
+    
     try:
         url = os.environ.get('SUPABASE_URL')
         key = os.environ.get('SUPABASE_ANON_KEY')
@@ -129,6 +144,7 @@ def get_supabase_client():
             raise Exception("SUPABASE_URL and SUPABASE_ANON_KEY environment variables are required")
         
         supabase: Client = create_client(url, key)
+        _supabase_client = supabase
         return supabase
     except Exception as e:
         print(f"Error initializing Supabase client: {e}")
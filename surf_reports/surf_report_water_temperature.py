@@ -1,8 +1,31 @@
 import sys
 import datetime
+import traceback
+from math import isnan
 from surfpy.buoystation import BuoyStation
 import surfpy
 
+# Tamarack location used by the standalone water temperature report - built once at import
+TAMARACK_LOCATION = surfpy.Location(33.0742, -117.3095, altitude=30.0, name='Tamarack')
+TAMARACK_LOCATION.depth = 25.0
+TAMARACK_LOCATION.angle = 225.0
+TAMARACK_LOCATION.slope = 0.02
+
+# Buoys to read water temperature from, in order of preference
+WATER_TEMP_BUOYS = [
+    ('46225', 'Torrey Pines Outer'),
+    ('46232', 'Point Loma'),
+    ('46086', 'San Clemente Basin'),
+    ('46069', 'South Santa Rosa Island')
+]
+
+def valid_water_temperature(reading):
+    """Return the reading's water temperature, or None if it is missing, NaN or -999"""
+    water_temp_f = getattr(reading, 'water_temperature', None)
+    if water_temp_f is None or water_temp_f == -999 or isnan(water_temp_f):
+        return None
+    return water_temp_f
+
 def get_water_temp_forecast(wave_location, hours_forecast=1):
     """
     Get water temperature data for a specific location.
@@ -14,144 +37,74 @@ def get_water_temp_forecast(wave_location, hours_forecast=1):
     Returns:
         List of tuples: [(water_temp, hour), ...] - currently just one reading
     """
-    try:
-        print("Fetching water temperature from Torrey Pines Outer buoy (46225)...")
-        
-        # Use Torrey Pines Outer buoy for data
-        torrey_pines_buoy = BuoyStation('46225', wave_location)
-        
-        # Fetch latest reading
-        latest_reading = torrey_pines_buoy.fetch_latest_reading()
-        
-        if latest_reading and hasattr(latest_reading, 'water_temperature') and latest_reading.water_temperature is not None:
-            water_temp_f = latest_reading.water_temperature
+    for station_id, station_name in WATER_TEMP_BUOYS:
+        try:
+            print(f"Fetching water temperature from {station_name} buoy ({station_id})...")
+            buoy = BuoyStation(station_id, wave_location)
+            water_temp_f = valid_water_temperature(buoy.fetch_latest_reading())
             
-            # Check for valid data
-            if water_temp_f == water_temp_f and water_temp_f != -999:  # Not NaN and not missing
+            if water_temp_f is not None:
                 # Return as list of tuples with hour 0 (current reading)
                 return [(water_temp_f, 0)]
-        
-        # Try backup stations
-        backup_stations = [
-            ('46232', 'Point Loma'),
-            ('46086', 'San Clemente Basin'),
-            ('46069', 'South Santa Rosa Island')
-        ]
-        
-        for station_id, station_name in backup_stations:
-            try:
-                print(f"Trying backup station {station_id} ({station_name})...")
-                buoy = BuoyStation(station_id, wave_location)
-                latest_reading = buoy.fetch_latest_reading()
                 
-                if latest_reading and hasattr(latest_reading, 'water_temperature'):
-                    water_temp_f = latest_reading.water_temperature
-                    if water_temp_f == water_temp_f and water_temp_f != -999:  # Valid data
-                        return [(water_temp_f, 0)]
-                        
-            except Exception as e:
-                print(f"Error with backup station {station_id}: {e}")
-                continue
-                
-    except Exception as e:
-        print(f"Error fetching water temperature: {e}")
+        except Exception as e:
+            print(f"Error with buoy station {station_id}: {e}")
+            continue
         
     return []
 
-def get_water_temperature():
-    """Get current water temperature from Torrey Pines Outer buoy (46225)"""
+def read_water_temperature(station_id, station_name, location=TAMARACK_LOCATION):
+    """
+    Read the latest water temperature from a single buoy.
+    
+    Args:
+        station_id: NDBC buoy station ID
+        station_name: Human readable station name
+        location: surfpy.Location the buoy data is used for
+    
+    Returns:
+        Dictionary with water temperature details, or None if no valid reading
+    """
     try:
-        print("Fetching water temperature from Torrey Pines Outer buoy (46225)...")
+        print(f"Fetching water temperature from {station_name} buoy ({station_id})...")
+        latest_reading = BuoyStation(station_id, location).fetch_latest_reading()
         
-        # Create location for Tamarack (where we want predictions)
-        tamarack_location = surfpy.Location(33.0742, -117.3095, altitude=30.0, name='Tamarack')
-        tamarack_location.depth = 25.0
-        tamarack_location.angle = 225.0
-        tamarack_location.slope = 0.02
+        if not latest_reading:
+            print(f"Failed to fetch data from {station_name} buoy")
+            return None
         
-        # Use Torrey Pines Outer buoy for data
-        torrey_pines_buoy = BuoyStation('46225', tamarack_location)
+        water_temp_f = valid_water_temperature(latest_reading)
+        if water_temp_f is None:
+            print(f"No valid water temperature data from {station_name} buoy")
+            return None
         
-        # Fetch latest reading
-        latest_reading = torrey_pines_buoy.fetch_latest_reading()
+        water_temp_c = (water_temp_f - 32) * 5/9
+        print(f"Water Temperature: {water_temp_f:.1f}°F ({water_temp_c:.1f}°C) from {station_name} ({station_id})")
+        
+        return {
+            "water_temp_f": round(water_temp_f, 1),
+            "water_temp_c": round(water_temp_c, 1),
+            "station": station_name,
+            "station_id": station_id,
+            "timestamp": getattr(latest_reading, 'date', None)
+        }
         
-        if latest_reading:
-            print(f"Successfully fetched buoy data from station 46225")
-            
-            # Check if water temperature is available and valid
-            if hasattr(latest_reading, 'water_temperature') and latest_reading.water_temperature is not None:
-                water_temp_f = latest_reading.water_temperature
-                
-                # Check for invalid data (NaN or missing data indicators)
-                if water_temp_f == water_temp_f and water_temp_f != -999:  # Not NaN and not missing
-                    water_temp_c = (water_temp_f - 32) * 5/9
-                    
-                    print(f"Water Temperature: {water_temp_f:.1f}°F ({water_temp_c:.1f}°C)")
-                    print(f"Station: Torrey Pines Outer (46225)")
-                    
-                    # Also print other available data if present
-                    if hasattr(latest_reading, 'date'):
-                        print(f"Reading time: {latest_reading.date}")
-                    
-                    return {
-                        "water_temp_f": round(water_temp_f, 1),
-                        "water_temp_c": round(water_temp_c, 1),
-                        "station": "Torrey Pines Outer",
-                        "station_id": "46225",
-                        "timestamp": latest_reading.date if hasattr(latest_reading, 'date') else None
-                    }
-                else:
-                    print(f"Invalid water temperature data: {water_temp_f}")
-            else:
-                print("No water temperature data available from this buoy")
-                
-            # Print available attributes for debugging
-            print(f"Available data attributes: {[attr for attr in dir(latest_reading) if not attr.startswith('_')]}")
-            
-        else:
-            print("Failed to fetch data from Torrey Pines Outer buoy")
-            
     except Exception as e:
-        print(f"Error fetching water temperature: {e}")
-        import traceback
+        print(f"Error fetching water temperature from station {station_id}: {e}")
         traceback.print_exc()
-        
-    return None
+        return None
+
+def get_water_temperature():
+    """Get current water temperature from Torrey Pines Outer buoy (46225)"""
+    station_id, station_name = WATER_TEMP_BUOYS[0]
+    return read_water_temperature(station_id, station_name)
 
 def get_backup_water_temperature():
     """Fallback to other nearby buoys if Torrey Pines data not available"""
-    backup_stations = [
-        ('46232', 'Point Loma'),
-        ('46086', 'San Clemente Basin'),
-        ('46069', 'South Santa Rosa Island')
-    ]
-    
-    tamarack_location = surfpy.Location(33.0742, -117.3095, altitude=30.0, name='Tamarack')
-    
-    for station_id, station_name in backup_stations:
-        try:
-            print(f"Trying backup station {station_id} ({station_name})...")
-            buoy = BuoyStation(station_id, tamarack_location)
-            latest_reading = buoy.fetch_latest_reading()
-            
-            if latest_reading and hasattr(latest_reading, 'water_temperature'):
-                water_temp_f = latest_reading.water_temperature
-                if water_temp_f == water_temp_f and water_temp_f != -999:  # Valid data
-                    water_temp_c = (water_temp_f - 32) * 5/9
-                    
-                    print(f"Backup water temperature from {station_name}: {water_temp_f:.1f}°F ({water_temp_c:.1f}°C)")
-                    
-                    return {
-                        "water_temp_f": round(water_temp_f, 1),
-                        "water_temp_c": round(water_temp_c, 1),
-                        "station": station_name,
-                        "station_id": station_id,
-                        "timestamp": latest_reading.date if hasattr(latest_reading, 'date') else None
-                    }
-                    
-        except Exception as e:
-            print(f"Error with backup station {station_id}: {e}")
-            continue
+    for station_id, station_name in WATER_TEMP_BUOYS[1:]:
+        water_temp = read_water_temperature(station_id, station_name)
+        if water_temp:
+            return water_temp
     
     return None
 
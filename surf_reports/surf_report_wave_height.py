@@ -1,16 +1,19 @@
 import sys
-import matplotlib.pyplot as plt
 import surfpy
-def get_surf_forecast(wave_location, num_hours_to_forecast):
+
+def fetch_wave_data(wave_location, num_hours_to_forecast):
     """
-    Get surf forecast data for a given location and time period.
+    Fetch GFS wave model data for a location with breaking wave heights solved.
+    
+    The result can be shared by get_surf_forecast and get_period_forecast so the
+    GRIB data is only downloaded and parsed once per spot.
     
     Args:
         wave_location: surfpy.Location object with depth, angle, and slope set
         num_hours_to_forecast: Number of hours to forecast (e.g., 168 for 7 days)
     
     Returns:
-        List of tuples: [(high, low, avg, hour_#), ...] for each hour from 0 to num_hours_to_forecast
+        List of surfpy buoy data points in english units, or None if the fetch failed
     """
     global_wave_model = surfpy.us_west_coast_gfs_wave_model()
 
@@ -23,11 +26,29 @@ def get_surf_forecast(wave_location, num_hours_to_forecast):
         print('Failed to fetch wave forecast data')
         return None
 
-    # Show breaking wave heights
+    # Solve breaking wave heights
     for dat in data:
         dat.solve_breaking_wave_heights(wave_location)
         dat.change_units(surfpy.units.Units.english)
 
+    return data
+
+def get_surf_forecast(wave_location, num_hours_to_forecast, wave_data=None):
+    """
+    Get surf forecast data for a given location and time period.
+    
+    Args:
+        wave_location: surfpy.Location object with depth, angle, and slope set
+        num_hours_to_forecast: Number of hours to forecast (e.g., 168 for 7 days)
+        wave_data: Optional result of fetch_wave_data to reuse instead of fetching again
+    
+    Returns:
+        List of tuples: [(high, low, avg, hour_#), ...] for each hour from 0 to num_hours_to_forecast
+    """
+    data = wave_data if wave_data is not None else fetch_wave_data(wave_location, num_hours_to_forecast)
+    if not data:
+        return None
+
     maxs = [x.maximum_breaking_height for x in data]
     mins = [x.minimum_breaking_height for x in data]
     summary = [x.wave_summary.wave_height for x in data]